@@ -6,30 +6,81 @@ Exposes HTTP endpoints for the web demo
 
 Usage:
     pip install fastapi uvicorn
-    uvicorn omin_api:app --host 0.0.0.0 --port 8001 --reload
+    python omin_api.py                  # production: no reload, warning-level logs
+    OMIN_RELOAD=1 python omin_api.py    # development: auto-reload, access log
+    OMIN_WORKERS=4 python omin_api.py   # worker processes (default: one per core)
+    OMIN_SERVER=granian python omin_api.py  # serve with granian instead of uvicorn
+
+    Under a systemd .socket unit (ListenStream=8001) the inherited socket is
+    used instead of binding one, so restarts don't refuse connections.
 
 Created by: Joel Trout
 For: Brave1 / Ukrainian Armed Forces
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from enum import Enum
+import asyncio
+import json
+import logging
+import logging.config
+import os
+import socket
 import time
 
 # Import the doctrine service
 from doctrine_service_multilayer import (
     ThreatInput, AvailableSystem, OperationalConstraints,
-    ARBITERDoctrineService, ThreatType, SystemType, TargetPriority
+    ARBITERDoctrineService, BatteryDoctrine, SYSTEM_SPECS,
+    ThreatType, SystemType, TargetPriority
+)
+
+# One doctrine service per process, so its HTTP session (connection pool)
+# and ranking cache persist across requests
+ARBITER_URL = os.environ.get("ARBITER_URL", "https://api.arbiter.traut.ai/v1/compare")
+# Colocated ARBITER: reach it over a Unix socket, skipping loopback TCP
+ARBITER_UDS = os.environ.get("ARBITER_UDS") or None
+# Opt-in: gzip large request bodies, only if ARBITER decodes Content-Encoding
+ARBITER_GZIP = os.environ.get("ARBITER_GZIP", "0") == "1"
+# Startup warm-up probe; unset: /health on the ARBITER_URL origin
+ARBITER_HEALTH_URL = os.environ.get("ARBITER_HEALTH_URL") or None
+service = ARBITERDoctrineService(
+    arbiter_url=ARBITER_URL, uds=ARBITER_UDS, compress_requests=ARBITER_GZIP,
+    arbiter_health_url=ARBITER_HEALTH_URL
 )
 
+# Opt-in: coalesce concurrent ARBITER calls into batch requests (needs the
+# ARBITER batch endpoint); the window is how long the first caller may wait
+ARBITER_BATCH_WINDOW_MS = float(os.environ.get("ARBITER_BATCH_WINDOW_MS", "0"))
+if ARBITER_BATCH_WINDOW_MS > 0:
+    service.enable_batching(max_delay=ARBITER_BATCH_WINDOW_MS / 1000)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm each worker before it accepts traffic: one Odesa option generation
+    fills the doctrine's options and success-rate caches off the request path,
+    and the ARBITER connection is opened up front (an unreachable ARBITER is
+    logged here rather than discovered by the first request).
+    Drain the shared ARBITER clients (and batcher) on shutdown.
+    """
+    BatteryDoctrine.generate_options(_ODESA_THREAT, _ODESA_SYSTEMS, _ODESA_CONSTRAINTS)
+    await service.warm_up_async()
+    yield
+    await service.aclose()
+    service.close()
+
 app = FastAPI(
     title="Omin API Service",
     description="Multi-layer air defense decision support API",
-    version="2.0"
+    version="2.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for web demo
@@ -41,6 +92,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Recommendation payloads are several KB of Cyrillic text; compress anything
+# over 1 KB (fast level: these are generated per request)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
+
 # ============================================================================
 # PYDANTIC MODELS FOR API
 # ============================================================================
@@ -102,49 +157,56 @@ class BatteryResponse(BaseModel):
     options_generated: int
     ranked_recommendations: List[RecommendationResponse]
     threat_summary: Dict[str, Any]
+    # 'arbiter', 'cache', or 'fallback' (ARBITER unavailable: local
+    # doctrine-only ranking, treat as degraded)
+    ranking_source: str = "arbiter"
     error: Optional[str] = None
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Wire-format names → doctrine enums (built once at import)
+_THREAT_TYPE_MAP = {
+    "Shahed-136": ThreatType.SHAHED_136,
+    "Shahed-131": ThreatType.SHAHED_131,
+    "Geran-2": ThreatType.GERAN_2,
+    "Lancet": ThreatType.LANCET,
+    "FPV": ThreatType.FPV,
+    "Orlan-10": ThreatType.ORLAN,
+}
+
+_SYSTEM_TYPE_MAP = {
+    "Patriot": SystemType.PATRIOT,
+    "IRIS-T": SystemType.IRIS_T,
+    "Buk-M1": SystemType.BUK_M1,
+    "Stinger": SystemType.STINGER,
+    "Igla": SystemType.IGLA,
+    "Vampire Interceptor Drone": SystemType.INTERCEPTOR_DRONE,
+    "Mobile Firing Group (ЗУ-23-2)": SystemType.MOBILE_GROUP,
+    "Mi-8 Helicopter System": SystemType.HELICOPTER,
+    "ЗУ-23-2": SystemType.ZU_23,
+    "РЕБ Буковель": SystemType.BUKOVEL,
+}
+
+_PRIORITY_MAP = {
+    "Критичний": TargetPriority.CRITICAL,
+    "Високий": TargetPriority.HIGH,
+    "Середній": TargetPriority.MEDIUM,
+    "Низький": TargetPriority.LOW,
+}
+
 def convert_threat_type(threat_str: str) -> ThreatType:
     """Convert string to ThreatType enum"""
-    mapping = {
-        "Shahed-136": ThreatType.SHAHED_136,
-        "Shahed-131": ThreatType.SHAHED_131,
-        "Geran-2": ThreatType.GERAN_2,
-        "Lancet": ThreatType.LANCET,
-        "FPV": ThreatType.FPV,
-        "Orlan-10": ThreatType.ORLAN,
-    }
-    return mapping.get(threat_str, ThreatType.UNKNOWN)
+    return _THREAT_TYPE_MAP.get(threat_str, ThreatType.UNKNOWN)
 
 def convert_system_type(system_str: str) -> SystemType:
     """Convert string to SystemType enum"""
-    mapping = {
-        "Patriot": SystemType.PATRIOT,
-        "IRIS-T": SystemType.IRIS_T,
-        "Buk-M1": SystemType.BUK_M1,
-        "Stinger": SystemType.STINGER,
-        "Igla": SystemType.IGLA,
-        "Vampire Interceptor Drone": SystemType.INTERCEPTOR_DRONE,
-        "Mobile Firing Group (ЗУ-23-2)": SystemType.MOBILE_GROUP,
-        "Mi-8 Helicopter System": SystemType.HELICOPTER,
-        "ЗУ-23-2": SystemType.ZU_23,
-        "РЕБ Буковель": SystemType.BUKOVEL,
-    }
-    return mapping.get(system_str, SystemType.ZU_23)  # Default fallback
+    return _SYSTEM_TYPE_MAP.get(system_str, SystemType.ZU_23)  # Default fallback
 
 def convert_target_priority(priority_str: str) -> TargetPriority:
     """Convert string to TargetPriority enum"""
-    mapping = {
-        "Критичний": TargetPriority.CRITICAL,
-        "Високий": TargetPriority.HIGH,
-        "Середній": TargetPriority.MEDIUM,
-        "Низький": TargetPriority.LOW,
-    }
-    return mapping.get(priority_str, TargetPriority.MEDIUM)
+    return _PRIORITY_MAP.get(priority_str, TargetPriority.MEDIUM)
 
 def api_to_doctrine_models(request: BatteryRequest) -> tuple:
     """Convert API models to Doctrine Service models"""
@@ -204,40 +266,30 @@ async def serve_frontend():
 @app.get("/health")
 async def health():
     """Detailed health check"""
-    # TODO: Check ARBITER service connectivity
+    # Breaker state, not a live probe: 'open' means ARBITER recently failed
+    # and rankings are served from the doctrine-only fallback
+    arbiter_state = service.arbiter_state
     return {
-        "status": "healthy",
-        "arbiter_service": "connected",  # Should actually check
+        "status": "healthy" if arbiter_state == "closed" else "degraded",
+        "arbiter_service": arbiter_state,
         "doctrine_templates": 6,
         "timestamp": time.time()
     }
 
-@app.post("/v1/battery", response_model=BatteryResponse)
-async def process_battery_scenario(request: BatteryRequest):
-    """
-    Process a battery-level tactical scenario and return ranked recommendations.
-    
-    This endpoint:
-    1. Accepts threat parameters, available systems, and constraints
-    2. Generates tactical options using doctrine templates
-    3. Evaluates options with ARBITER for semantic coherence
-    4. Returns ranked recommendations
-    """
-    
+async def process_doctrine_situation(threat: ThreatInput,
+                                     systems: List[AvailableSystem],
+                                     constraints: OperationalConstraints,
+                                     commander_context: str = "") -> BatteryResponse:
+    """Run the shared doctrine service on already-converted models"""
+
     try:
-        # Convert API models to Doctrine Service models
-        threat, systems, constraints = api_to_doctrine_models(request)
-        
-        # Initialize doctrine service
-        # TODO: Make ARBITER URL configurable via environment variable
-        service = ARBITERDoctrineService(arbiter_url="https://api.arbiter.traut.ai/v1/compare")
-        
-        # Process scenario
-        result = service.process_battery_situation(
+        # Process scenario (shared module-level service); ARBITER is awaited,
+        # so the event loop keeps serving other requests meanwhile
+        result = await service.process_battery_situation_async(
             threat=threat,
             systems=systems,
             constraints=constraints,
-            commander_context=request.commander_context
+            commander_context=commander_context
         )
         
         if not result['success']:
@@ -246,30 +298,17 @@ async def process_battery_scenario(request: BatteryRequest):
                 detail=result.get('error', 'Doctrine service processing failed')
             )
         
-        # Convert to response format
-        recommendations = [
-            RecommendationResponse(
-                rank=rec['rank'],
-                coherence=rec['coherence'],
-                title=rec['title'],
-                description=rec['description'],
-                template_id=rec['template_id'],
-                estimated_cost=rec['estimated_cost'],
-                estimated_success_rate=rec['estimated_success_rate'],
-                systems_used=rec['systems_used'],
-                recommendation_level=rec['recommendation_level']
-            )
-            for rec in result['ranked_recommendations']
-        ]
-        
+        # Ranked dicts are validated into RecommendationResponse by pydantic-core
+        # in one pass; response_model then serializes straight to JSON bytes
         return BatteryResponse(
             success=True,
             generation_time_ms=result['generation_time_ms'],
             arbiter_latency_ms=result['arbiter_latency_ms'],
             total_time_ms=result['total_time_ms'],
             options_generated=result['options_generated'],
-            ranked_recommendations=recommendations,
-            threat_summary=result['threat_summary']
+            ranked_recommendations=result['ranked_recommendations'],
+            threat_summary=result['threat_summary'],
+            ranking_source=result['ranking_source']
         )
         
     except HTTPException:
@@ -280,37 +319,146 @@ async def process_battery_scenario(request: BatteryRequest):
             detail=f"Internal server error: {str(e)}"
         )
 
+@app.post("/v1/battery", response_model=BatteryResponse)
+async def process_battery_scenario(request: BatteryRequest):
+    """
+    Process a battery-level tactical scenario and return ranked recommendations.
+    
+    This endpoint:
+    1. Accepts threat parameters, available systems, and constraints
+    2. Generates tactical options using doctrine templates
+    3. Evaluates options with ARBITER for semantic coherence
+    4. Returns ranked recommendations
+    """
+    
+    try:
+        # Convert API models to Doctrine Service models
+        threat, systems, constraints = api_to_doctrine_models(request)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+    
+    return await process_doctrine_situation(
+        threat, systems, constraints, request.commander_context
+    )
+
 # ============================================================================
 # CONVENIENCE ENDPOINTS FOR TESTING
 # ============================================================================
 
+# Templates and specs are fixed at import, so both bodies are encoded once
+_TEMPLATES_JSON = JSONResponse({
+    "count": len(BatteryDoctrine.TEMPLATES),
+    "templates": [
+        {"id": template_id, "title": template_def['title']}
+        for template_id, template_def in BatteryDoctrine.TEMPLATES.items()
+    ]
+}).body
+
+_SYSTEM_SPECS_JSON = JSONResponse({
+    system_type.value: spec for system_type, spec in SYSTEM_SPECS.items()
+}).body
+
 @app.get("/api/templates")
 async def list_templates():
     """List available doctrine templates"""
-    from doctrine_service_multilayer import BatteryDoctrine
-    
-    templates = []
-    for template_id, template_def in BatteryDoctrine.TEMPLATES.items():
-        templates.append({
-            "id": template_id,
-            "title": template_def['title']
-        })
-    
-    return {
-        "count": len(templates),
-        "templates": templates
-    }
+    return Response(content=_TEMPLATES_JSON, media_type="application/json")
 
 @app.get("/api/system-specs")
 async def get_system_specs():
     """Get system specifications for reference"""
-    from doctrine_service_multilayer import SYSTEM_SPECS
-    
-    specs = {}
-    for system_type, spec in SYSTEM_SPECS.items():
-        specs[system_type.value] = spec
-    
-    return specs
+    return Response(content=_SYSTEM_SPECS_JSON, media_type="application/json")
+
+# October 19, 2024 Odesa scenario, as doctrine models so the validation
+# endpoint skips the API-model round trip
+_ODESA_THREAT = ThreatInput(
+    threat_type=ThreatType.SHAHED_136,
+    count=5,  # 2 port + 3 power
+    range_km=25.0,
+    bearing=45,
+    altitude_m=1200,
+    speed_kmh=185,
+    target_description="Порт та електростанція (КРИТИЧНІ)",
+    target_priority=TargetPriority.CRITICAL
+)
+
+_ODESA_SYSTEMS = [
+    AvailableSystem(
+        system_type=SystemType.IRIS_T,
+        count=2,
+        missiles_available=6,
+        cost_per_shot=500000,
+        effective_range_km=40,
+        success_rate=0.93,
+        reload_time_minutes=720
+    ),
+    AvailableSystem(
+        system_type=SystemType.BUK_M1,
+        count=1,
+        missiles_available=3,
+        cost_per_shot=100000,
+        effective_range_km=35,
+        success_rate=0.85,
+        reload_time_minutes=480
+    ),
+    AvailableSystem(
+        system_type=SystemType.STINGER,
+        count=4,
+        missiles_available=8,
+        cost_per_shot=40000,
+        effective_range_km=5,
+        success_rate=0.70,
+        reload_time_minutes=120
+    ),
+    AvailableSystem(
+        system_type=SystemType.INTERCEPTOR_DRONE,
+        count=4,
+        missiles_available=4,
+        cost_per_shot=5000,
+        effective_range_km=20,
+        success_rate=0.60,
+        reload_time_minutes=30
+    ),
+    AvailableSystem(
+        system_type=SystemType.MOBILE_GROUP,
+        count=2,
+        missiles_available=2,
+        cost_per_shot=500,
+        effective_range_km=2.5,
+        success_rate=0.35,
+        reload_time_minutes=15,
+        setup_time_minutes=15
+    ),
+    AvailableSystem(
+        system_type=SystemType.HELICOPTER,
+        count=1,
+        missiles_available=1,
+        cost_per_shot=2000,
+        effective_range_km=10,
+        success_rate=0.50,
+        reload_time_minutes=90,
+        weather_dependent=True
+    )
+]
+
+_ODESA_CONSTRAINTS = OperationalConstraints(
+    limited_ammunition=True,
+    weather_conditions="Marginal",
+    expected_follow_on_waves=2,
+    resupply_time_hours=24
+)
+
+_ODESA_CONTEXT = "Odesa sector, October 19, 2024 validation"
+
+# The Odesa scenario is hardcoded, so its response is memoized briefly to
+# keep demo traffic off ARBITER: (expires_at monotonic, response). Only
+# ARBITER-ranked responses are kept, never the degraded fallback, and the lock
+# makes concurrent misses share one pipeline run.
+ODESA_CACHE_TTL_SECONDS = 60.0
+_odesa_cache: Optional[tuple] = None
+_odesa_lock = asyncio.Lock()
 
 @app.post("/api/validate-odesa")
 async def validate_odesa_scenario():
@@ -318,89 +466,30 @@ async def validate_odesa_scenario():
     Run the October 19, 2024 Odesa validation scenario.
     This demonstrates what Omin would have recommended vs what was actually done.
     """
+    global _odesa_cache
+
+    if _odesa_cache is not None and _odesa_cache[0] > time.monotonic():
+        return _odesa_cache[1]
+
+    async with _odesa_lock:
+        if _odesa_cache is not None and _odesa_cache[0] > time.monotonic():
+            return _odesa_cache[1]
+
+        response = await _run_odesa_validation()
+        ranking_source = (response["ranking_source"] if isinstance(response, dict)
+                          else response.ranking_source)
+        if ranking_source != "fallback":  # 'arbiter', or ARBITER's ranking memoized
+            _odesa_cache = (time.monotonic() + ODESA_CACHE_TTL_SECONDS, response)
+        return response
+
+async def _run_odesa_validation():
+    """Uncached body of validate_odesa_scenario"""
     
-    # Define the actual scenario
-    request = BatteryRequest(
-        threat=ThreatInputAPI(
-            threat_type="Shahed-136",
-            count=5,  # 2 port + 3 power
-            range_km=25.0,
-            bearing=45,
-            altitude_m=1200,
-            speed_kmh=185,
-            target_description="Порт та електростанція (КРИТИЧНІ)",
-            target_priority="Критичний"
-        ),
-        systems=[
-            AvailableSystemAPI(
-                system_type="IRIS-T",
-                count=2,
-                missiles_available=6,
-                cost_per_shot=500000,
-                effective_range_km=40,
-                success_rate=0.93,
-                reload_time_minutes=720
-            ),
-            AvailableSystemAPI(
-                system_type="Buk-M1",
-                count=1,
-                missiles_available=3,
-                cost_per_shot=100000,
-                effective_range_km=35,
-                success_rate=0.85,
-                reload_time_minutes=480
-            ),
-            AvailableSystemAPI(
-                system_type="Stinger",
-                count=4,
-                missiles_available=8,
-                cost_per_shot=40000,
-                effective_range_km=5,
-                success_rate=0.70,
-                reload_time_minutes=120
-            ),
-            AvailableSystemAPI(
-                system_type="Vampire Interceptor Drone",
-                count=4,
-                missiles_available=4,
-                cost_per_shot=5000,
-                effective_range_km=20,
-                success_rate=0.60,
-                reload_time_minutes=30
-            ),
-            AvailableSystemAPI(
-                system_type="Mobile Firing Group (ЗУ-23-2)",
-                count=2,
-                missiles_available=2,
-                cost_per_shot=500,
-                effective_range_km=2.5,
-                success_rate=0.35,
-                reload_time_minutes=15,
-                setup_time_minutes=15
-            ),
-            AvailableSystemAPI(
-                system_type="Mi-8 Helicopter System",
-                count=1,
-                missiles_available=1,
-                cost_per_shot=2000,
-                effective_range_km=10,
-                success_rate=0.50,
-                reload_time_minutes=90,
-                weather_dependent=True
-            )
-        ],
-        constraints=OperationalConstraintsAPI(
-            limited_ammunition=True,
-            weather_conditions="Marginal",
-            expected_follow_on_waves=2,
-            resupply_time_hours=24
-        ),
-        commander_context="Odesa sector, October 19, 2024 validation"
+    # Process scenario (doctrine models built once at import)
+    result = await process_doctrine_situation(
+        _ODESA_THREAT, _ODESA_SYSTEMS, _ODESA_CONSTRAINTS, _ODESA_CONTEXT
     )
     
-    # Process scenario
-    result = await process_battery_scenario(request)
-    
     # Add comparison data
     actual_result = {
         "actual_cost_euros": 2_600_000,
@@ -440,10 +529,64 @@ async def validate_odesa_scenario():
 # RUN SERVER
 # ============================================================================
 
+def _listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """
+    Listening socket bound once by the launcher and shared by every worker,
+    with Linux accept-path tuning applied where the platform supports it.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, "TCP_DEFER_ACCEPT"):
+        # Wake a worker only once request bytes arrive, not on the bare handshake
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_DEFER_ACCEPT, 5)
+    if hasattr(socket, "TCP_FASTOPEN"):
+        # Returning clients may send the request with the SYN
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_FASTOPEN, 256)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+class _JsonLogFormatter(logging.Formatter):
+    """One JSON object per log record, for log aggregation (OMIN_LOG_JSON=1)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def _json_log_config(level: str) -> Dict[str, Any]:
+    """uvicorn log_config routing server and doctrine logs through _JsonLogFormatter"""
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {"json": {"()": _JsonLogFormatter}},
+        "handlers": {
+            "default": {"class": "logging.StreamHandler", "formatter": "json",
+                        "stream": "ext://sys.stdout"}
+        },
+        "loggers": {
+            name: {"handlers": ["default"], "level": level.upper(), "propagate": False}
+            for name in ("uvicorn", "uvicorn.access", "omin")
+        }
+    }
+
 if __name__ == "__main__":
-    import uvicorn
-    
-    print("""
+    json_logs = os.environ.get("OMIN_LOG_JSON") == "1"
+
+    if json_logs:
+        logging.config.dictConfig(_json_log_config("info"))
+        logging.getLogger("omin.api").info(
+            "startup: port 8001, arbiter %s, endpoints /v1/battery /api/validate-odesa "
+            "/api/templates /api/system-specs", ARBITER_URL
+        )
+    else:
+        print("""
 ╔══════════════════════════════════════════════════════════════════════════════════════╗
 ║                              OMIN API SERVICE                                         ║
 ║                                                                                       ║
@@ -462,10 +605,59 @@ if __name__ == "__main__":
 ╚══════════════════════════════════════════════════════════════════════════════════════╝
     """)
     
-    uvicorn.run(
-        "omin_api:app",
-        host="0.0.0.0",
-        port=8001,
-        reload=True,
-        log_level="info"
-    )
+    # Auto-reload (file watcher + supervisor process) is for development only
+    reload = os.environ.get("OMIN_RELOAD") == "1"
+    # One async worker process per core; each holds its own service, pools and caches
+    workers = 1 if reload else int(os.environ.get("OMIN_WORKERS", os.cpu_count() or 1))
+
+    backlog = 4096
+
+    if os.environ.get("OMIN_SERVER") == "granian":
+        # Optional Rust ASGI server (pip install granian); binds its own socket
+        from granian import Granian
+        from granian.constants import Interfaces
+
+        Granian(
+            "omin_api:app",
+            address="0.0.0.0",
+            port=8001,
+            interface=Interfaces.ASGI,
+            workers=workers,
+            websockets=False,
+            backlog=backlog,
+            reload=reload
+        ).serve()
+    else:
+        import uvicorn
+        from uvicorn.config import LOGGING_CONFIG
+
+        if os.environ.get("LISTEN_FDS") and os.environ.get("LISTEN_PID") == str(os.getpid()):
+            # systemd socket activation: the unit's socket (kept open across
+            # service restarts) arrives as the first passed fd
+            listen_fd = 3  # SD_LISTEN_FDS_START
+        else:
+            listener = _listen_socket("0.0.0.0", 8001, backlog)
+            listen_fd = listener.fileno()
+
+        uvicorn.run(
+            "omin_api:app",
+            fd=listen_fd,
+            reload=reload,
+            # Watch only this service's directory; uvicorn[standard] ships watchfiles,
+            # so changes arrive as inotify events rather than a periodic stat walk
+            reload_dirs=[os.path.dirname(os.path.abspath(__file__))] if reload else None,
+            workers=workers,
+            # "auto" already picks uvloop/httptools (both in uvicorn[standard]) and
+            # falls back to asyncio/h11 where they can't install (e.g. Windows)
+            loop="auto",
+            http="auto",
+            ws="none",  # no WebSocket routes: skip loading a websockets implementation
+            lifespan="on",
+            # Bursty scenario traffic: deeper accept queue, and keep client
+            # connections open long enough to be reused between requests
+            backlog=backlog,
+            timeout_keep_alive=75,
+            log_level="info" if reload else "warning",
+            log_config=_json_log_config("info" if reload else "warning") if json_logs else LOGGING_CONFIG,
+            access_log=reload
+        )
@@ -0,0 +1,65 @@
+"""Option-generation cache behaviour (run: python -m unittest discover -s tests -t .)"""
+
+import unittest
+
+from doctrine_service_multilayer import (
+    AvailableSystem, BatteryDoctrine, OperationalConstraints,
+    SystemType, TargetPriority, ThreatInput, ThreatType
+)
+
+
+def _situation():
+    threat = ThreatInput(
+        threat_type=ThreatType.SHAHED_136,
+        count=5,
+        range_km=25.0,
+        bearing=45,
+        altitude_m=1200,
+        speed_kmh=185,
+        target_description="Порт та електростанція (КРИТИЧНІ)",
+        target_priority=TargetPriority.CRITICAL
+    )
+    systems = [
+        AvailableSystem(
+            system_type=SystemType.IRIS_T,
+            count=2,
+            missiles_available=6,
+            cost_per_shot=500_000,
+            effective_range_km=40,
+            success_rate=0.93,
+            reload_time_minutes=720
+        )
+    ]
+    constraints = OperationalConstraints(expected_follow_on_waves=2)
+    return threat, systems, constraints
+
+
+class GenerateOptionsCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        BatteryDoctrine.invalidate_options_cache()
+
+    def test_identical_calls_get_distinct_option_ids(self):
+        first = BatteryDoctrine.generate_options(*_situation())
+        second = BatteryDoctrine.generate_options(*_situation())
+
+        self.assertTrue(first)
+        ids = [opt.option_id for opt in first + second]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual([opt.description for opt in first],
+                         [opt.description for opt in second])
+
+    def test_caller_mutation_does_not_reach_the_cache(self):
+        first = BatteryDoctrine.generate_options(*_situation())
+        first[0].parameters['injected'] = True
+        first[0].systems_used.append('injected')
+
+        second = BatteryDoctrine.generate_options(*_situation())
+
+        self.assertIsNot(first[0], second[0])
+        self.assertNotIn('injected', second[0].parameters)
+        self.assertNotIn('injected', second[0].systems_used)
+
+
+if __name__ == "__main__":
+    unittest.main()